@@ -18,7 +18,9 @@ def decode(data, params):
     """
     try:
         data = zlib.decompress(data)
-        data = _remove_predictors(data, params.get("Predictor"), params.get("Columns"))
+        predictor = params.get("Predictor")
+        if predictor and predictor != 1:
+            data = _remove_predictors(data, predictor, params.get("Columns"))
     except zlib.error:
         logging.exception("Skipping broken stream")
         data = b''
@@ -5,7 +5,9 @@
 # - added decode() for PDF streams support
 
 
-import struct, logging
+import logging
+
+from itertools import chain
 
 from .predictors import _remove_predictors
 
@@ -17,6 +19,12 @@ END_OF_INFO_CODE = 257
 DEFAULT_MIN_BITS = 9
 DEFAULT_MAX_BITS = 12
 
+# single byte codebook entries
+_SINGLE_BYTES = tuple(bytes((value,)) for value in range(256))
+
+# MSB-first bits of every byte value
+_BYTE_BITS = tuple(tuple((value >> i) & 1 for i in range(7, -1, -1)) for value in range(256))
+
 
 def decode(data, params):
     """
@@ -27,7 +35,9 @@ def decode(data, params):
     """
     try:
         data = decompress(data)
-        data = _remove_predictors(data, params.get("Predictor"), params.get("Columns"))
+        predictor = params.get("Predictor")
+        if predictor and predictor != 1:
+            data = _remove_predictors(data, predictor, params.get("Columns"))
     except ValueError:
         logging.exception("Skipping broken stream")
         data = b''
@@ -44,6 +54,73 @@ def decompress(compressed_bytes):
     return decoder.decodefrombytes(compressed_bytes)
 
 
+def _lzw_decompress(data):
+    """
+    Single pass LZW decoder: unpacks variable-width codepoints, maintains
+    the codebook and collects the output at once.
+    Decoding stops on END_OF_INFO_CODE.
+
+    >>> _lzw_decompress(b'9\\x98M\\xa7\\x03a\\x94@t2\\x9e\\x0e\\x90\\x00')
+    b'sample text'
+    >>> _lzw_decompress(b'\\x80\\x1c\\xcc&\\xd3\\x81\\xb0\\xca :\\x19O\\x07H\\x08')
+    b'sample text'
+    >>> _lzw_decompress(b'\\x80\\x18LP($\\x04')
+    b'abababa'
+    """
+    max_codes = 1 << DEFAULT_MAX_BITS
+    out = bytearray()
+    # The codebook never exceeds max_codes entries, only first next_code ones are valid.
+    # Entries for CLEAR_CODE and END_OF_INFO_CODE are never looked up.
+    codepoints = [b''] * max_codes
+    codepoints[:256] = _SINGLE_BYTES
+    next_code = END_OF_INFO_CODE + 1
+    prefix = None
+
+    # Code width is a variable on purpose: separate loops per width (9..12 bits) with constant
+    # masks were measured slower, CPython gains nothing from constant shift operands.
+    pointwidth = DEFAULT_MIN_BITS
+    mask = (1 << pointwidth) - 1
+    # PDF streams switch code width one code early (EarlyChange=1)
+    grow_at = mask
+    buf = 0
+    nbits = 0
+
+    for value in data:
+        buf = ((buf << 8) | value) & 0xFFFFFFFF
+        nbits += 8
+
+        while nbits >= pointwidth:
+            nbits -= pointwidth
+            codepoint = (buf >> nbits) & mask
+
+            if codepoint < next_code:
+                if codepoint == CLEAR_CODE:
+                    next_code = END_OF_INFO_CODE + 1
+                    prefix = None
+                    pointwidth = DEFAULT_MIN_BITS
+                    mask = grow_at = (1 << pointwidth) - 1
+                    continue
+                elif codepoint == END_OF_INFO_CODE:
+                    return bytes(out)
+                entry = codepoints[codepoint]
+            elif codepoint == next_code and prefix is not None:
+                entry = prefix + prefix[0:1]
+            else:
+                raise ValueError("Unexpected LZW code {}".format(codepoint))
+
+            out += entry
+
+            if prefix is not None and next_code < max_codes:
+                codepoints[next_code] = prefix + entry[0:1]
+                next_code += 1
+                if next_code >= grow_at and pointwidth < DEFAULT_MAX_BITS:
+                    pointwidth += 1
+                    mask = grow_at = (1 << pointwidth) - 1
+            prefix = entry
+
+    return bytes(out)
+
+
 class ByteDecoder(object):
     """
     Decodes, combines bit-unpacking and interpreting a codepoint
@@ -53,25 +130,13 @@ class ByteDecoder(object):
     See L{ByteDecoder} for a usage example.
     """
 
-    def __init__(self):
-        """
-        """
-
-        self._decoder = Decoder()
-        self._unpacker = BitUnpacker(initial_code_size=self._decoder.code_size())
-        self.remaining = []
-
     def decodefrombytes(self, bytesource):
         """
-        Given an iterator over BitPacked, Encoded bytes, Returns an
-        iterator over the uncompressed bytes. Dual of
-        L{ByteEncoder.encodetobytes}. See L{ByteEncoder} for an
+        Given BitPacked, Encoded bytes, returns the uncompressed bytes.
+        Dual of L{ByteEncoder.encodetobytes}. See L{ByteEncoder} for an
         example of use.
         """
-        codepoints = self._unpacker.unpack(bytesource)
-        clearbytes = self._decoder.decode(codepoints)
-
-        return clearbytes
+        return _lzw_decompress(bytesource)
 
 
 class BitUnpacker(object):
@@ -90,7 +155,7 @@ class BitUnpacker(object):
 
     def unpack(self, bytesource):
         """
-        Given an iterator of bytes, returns an iterator of integer
+        Given bytes (or any iterable of byte values), returns an iterator of integer
         code points. Auto-magically adjusts point width when it sees
         an almost-overflow in the input stream, or an LZW CLEAR_CODE
         or END_OF_INFO_CODE
@@ -108,44 +173,42 @@ class BitUnpacker(object):
         >>> [ i for i in unpk.unpack([0x00, 0xC0, 0x40]) ]
         [1, 257]
         """
-        bits = []
-        offset = 0
-        ignore = 0
-
         codesize = self._initial_code_size
         minwidth = 8
         while (1 << minwidth) < codesize:
             minwidth = minwidth + 1
 
         pointwidth = minwidth
+        mask = (1 << pointwidth) - 1
 
-        for nextbit in bytestobits(bytesource):
+        # bit accumulator: nbits of not yet consumed bits are kept in the lowest bits of buf
+        buf = 0
+        nbits = 0
 
-            offset = (offset + 1) % 8
-            if ignore > 0:
-                ignore = ignore - 1
-                continue
+        for value in bytesource:
+            buf = ((buf << 8) | value) & 0xFFFFFFFF
+            nbits += 8
 
-            bits.append(nextbit)
-
-            if len(bits) == pointwidth:
-                codepoint = intfrombits(bits)
-                bits = []
+            while nbits >= pointwidth:
+                nbits -= pointwidth
+                codepoint = (buf >> nbits) & mask
 
                 yield codepoint
 
                 codesize = codesize + 1
 
-                if codepoint in [CLEAR_CODE, END_OF_INFO_CODE]:
+                if codepoint == CLEAR_CODE or codepoint == END_OF_INFO_CODE:
                     codesize = self._initial_code_size
                     pointwidth = minwidth
                 else:
                     # is this too late?
-                    while codesize >= (2 ** pointwidth):
+                    while codesize >= (1 << pointwidth):
                         pointwidth = pointwidth + 1
+                mask = (1 << pointwidth) - 1
 
                 if codepoint == END_OF_INFO_CODE:
-                    ignore = (8 - offset) % 8
+                    # skip the rest of the current byte
+                    nbits -= nbits % 8
 
 
 class Decoder(object):
@@ -176,11 +239,11 @@ class Decoder(object):
 
     def decode(self, codepoints):
         """
-        Given an iterable of integer codepoints, yields the
-        corresponding bytes, one at a time, as byte strings of length
-        E{1}. Retains the state of the codebook from call to call, so
-        if you have another stream, you'll likely need another
-        decoder!
+        Given an iterable of integer codepoints, returns the
+        corresponding uncompressed bytes. The iterable is consumed in
+        a single pass, so generators are fine. Retains the state of
+        the codebook from call to call, so if you have another stream,
+        you'll likely need another decoder!
 
         Decoders will NOT handle END_OF_INFO_CODE (rather, they will
         handle the code by throwing an exception); END_OF_INFO should
@@ -192,12 +255,11 @@ class Decoder(object):
         b'gabba gabba yo gabba'
 
         """
-        codepoints = [cp for cp in codepoints]
-
-        decoded = b''
+        decoded = bytearray()
+        decode_codepoint = self._decode_codepoint
         for cp in codepoints:
-            decoded += self._decode_codepoint(cp)
-        return decoded
+            decoded += decode_codepoint(cp)
+        return bytes(decoded)
 
     def _decode_codepoint(self, codepoint):
         """
@@ -226,23 +288,25 @@ class Decoder(object):
         elif codepoint == END_OF_INFO_CODE:
             raise ValueError("End of information code not supported directly by this Decoder")
         else:
-            if codepoint in self._codepoints:
+            if codepoint < len(self._codepoints):
                 ret = self._codepoints[codepoint]
                 if None != self._prefix:
-                    self._codepoints[len(self._codepoints)] = self._prefix + ret[0:1]
+                    self._codepoints.append(self._prefix + ret[0:1])
+
+            elif codepoint == len(self._codepoints) and None != self._prefix:
+                ret = self._prefix + self._prefix[0:1]
+                self._codepoints.append(ret)
 
             else:
-                ret = self._prefix + ret[0:1]
-                self._codepoints[len(self._codepoints)] = ret
+                raise ValueError("Unexpected LZW code {}".format(codepoint))
 
             self._prefix = ret
 
         return ret
 
     def _clear_codes(self):
-        self._codepoints = dict((pt, struct.pack("B", pt)) for pt in range(256))
-        self._codepoints[CLEAR_CODE] = CLEAR_CODE
-        self._codepoints[END_OF_INFO_CODE] = END_OF_INFO_CODE
+        # placeholders for CLEAR_CODE and END_OF_INFO_CODE, those are handled before the lookup
+        self._codepoints = list(_SINGLE_BYTES) + [None, None]
         self._prefix = None
 
 
@@ -272,13 +336,8 @@ def intfrombits(bits):
     304
     """
     ret = 0
-    lsb_first = [b for b in bits]
-    lsb_first.reverse()
-
-    for bit_index in range(len(lsb_first)):
-        if lsb_first[bit_index]:
-            ret = ret | (1 << bit_index)
-
+    for bit in bits:
+        ret = (ret << 1) | (1 if bit else 0)
     return ret
 
 
@@ -290,12 +349,7 @@ def bytestobits(bytesource):
     >>> [ x for x in bytestobits(b"\\x01\\x30") ]
     [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0]
     """
-    for value in bytesource:
-
-        for bitplusone in range(8, 0, -1):
-            bitindex = bitplusone - 1
-            nextbit = 1 & (value >> bitindex)
-            yield nextbit
+    return chain.from_iterable(map(_BYTE_BITS.__getitem__, bytesource))
 
 
 if __name__ == "__main__":
@@ -12,9 +12,6 @@ class SimpleCanvas(object):
     """
     forms = None
 
-    #: Shall be a meaningful string representation of page content for further usage (decoded strings + markdown for example)
-    text_content = None
-
     #: Shall be al list of decoded strings, no PDF commands
     strings = None
 
@@ -30,7 +27,24 @@ class SimpleCanvas(object):
     def reset(self):
         self.images = dict()
         self.forms = dict()
-        self.text_content = ""
+        self._text_chunks = []
         self.inline_images = []
         self.strings = []
 
+    @property
+    def text_content(self):
+        """ Shall be a meaningful string representation of page content for further usage
+            (decoded strings + markdown for example)
+        """
+        res = "".join(self._text_chunks)
+        # keep the joined string, so repeated reads don't join all chunks again
+        self._text_chunks = [res]
+        return res
+
+    @text_content.setter
+    def text_content(self, val):
+        self._text_chunks = [val]
+
+    def add_text_content(self, s):
+        """ Appends a piece of page content to :attr:`text_content` """
+        self._text_chunks.append(s)
@@ -1,7 +1,6 @@
 import logging
 
 from typing import List
-from copy import deepcopy
 
 
 class GraphicsState(object):
@@ -58,6 +57,17 @@ class GraphicsState(object):
         if self.Font:
             return self.Font[0]
 
+    def clone(self):
+        """ Returns a copy of the state. Array values (CTM, dash pattern, font) are copied,
+            other values are shared as nothing modifies them in place.
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        for k, v in new.__dict__.items():
+            if isinstance(v, list):
+                new.__dict__[k] = v[:]
+        return new
+
     def update(self, other):
         for f in self._fields:
             val = getattr(other, f, None)
@@ -74,7 +84,7 @@ class GraphicsStateStack(List[GraphicsState]):
 
     def save_state(self):
         """ Copies current state and puts it on the top """
-        self.append(deepcopy(self.state))
+        self.append(self.state.clone())
 
     def restore_state(self):
         """ Restore previously saved state from the top """
@@ -1,5 +1,8 @@
 import logging
 from base64 import b85encode
+from functools import lru_cache
+from itertools import chain, repeat
+from weakref import WeakKeyDictionary
 
 from pdfreader.constants import DEFAULT_ENCODING
 
@@ -16,50 +19,215 @@ from .pdfviewer import PDFViewer, ContextualViewer
 
 ascii_filters = asciihex.filter_names + ascii85.filter_names
 
-def object_to_string(obj):
-    if obj is None:
-        val = "null"
-    elif isinstance(obj, Boolean):
-        val = str(obj).lower()
-    elif isinstance(obj, Name):
-        val = "/" + obj
-    elif isinstance(obj, str):
-        val = obj
-    elif isinstance(obj, (int, Integer, Decimal)):
-        val = str(obj)
-    elif isinstance(obj, Array):
-        val = "[" + " ".join([object_to_string(elm) for elm in obj]) + "]"
-    elif isinstance(obj, Dictionary):
-        val = "<<" + " ".join(["/{} {}".format(k, object_to_string(v)) for k, v in obj.items()]) + ">>"
-    elif isinstance(obj, Operator):
-        operands = " ".join([object_to_string(a) for a in obj.args])
-        val = "\n{} {}".format(operands, obj.name)
-    elif isinstance(obj, InlineImage):
-        # Convert bytes to string representation
-        # We encode the image with ASCII85 to make it a unicode string
-        entries = " ".join(["/{} {}".format(k, object_to_string(v))
-                            for k, v in obj.dictionary.items()
-                            if k not in ('F', 'Filter')])
-        new_filters = obj.Filter if isinstance(obj.Filter, list) else [obj.Filter]
-        last_filter = new_filters[0]
-        if last_filter in ascii_filters:
-            # data stream contains ASCII characters
-            content = obj.data
+# InlineImage -> (data, ASCII85 encoded data) for callers serializing the same image more than once.
+# The encoding is reused only while image data is the very same object.
+_inline_image_b85 = WeakKeyDictionary()
+
+#: max number of decoded strings cached per viewer
+STR_CACHE_SIZE = 8192
+
+
+def _null_to_string(obj):
+    return "null"
+
+
+def _boolean_to_string(obj):
+    return "true" if obj else "false"
+
+
+def _name_to_string(obj):
+    return "/" + obj
+
+
+def _str_to_string(obj):
+    return obj
+
+
+def _number_to_string(obj):
+    return str(obj)
+
+
+def _array_to_string(obj):
+    return "[" + " ".join(map(_item_to_string, obj)) + "]"
+
+
+def _dictionary_to_string(obj):
+    return "<<" + " ".join(["/" + k + " " + _item_to_string(v) for k, v in obj.items()]) + ">>"
+
+
+# Arrays and dictionaries nested into each other are serialized by _nested_to_string
+_containers_bounds = {Array: ("[", "]"),
+                      Dictionary: ("<<", ">>")}
+
+
+def _container_bounds(obj):
+    """ Returns opening and closing brackets for an array or dictionary, subclasses included """
+    return _containers_bounds[Dictionary if isinstance(obj, Dictionary) else Array]
+
+
+def _container_items(obj):
+    """ Returns (prefix, value) pairs for array or dictionary items in output order """
+    if isinstance(obj, Dictionary):
+        return ((("/" if i == 0 else " /") + k + " ", v) for i, (k, v) in enumerate(obj.items()))
+    return zip(chain(("",), repeat(" ")), obj)
+
+
+def _nested_to_string(obj):
+    """ Serializes nested arrays and dictionaries with an explicit stack instead of recursion,
+        so the nesting depth is not limited by the recursion limit.
+
+        >>> import sys
+        >>> depth = sys.getrecursionlimit() + 100
+        >>> deep = 1
+        >>> for _ in range(depth):
+        ...     deep = [deep, {'K': 2}]
+        >>> object_to_string(deep) == "[" * depth + "1" + " <</K 2>>]" * depth
+        True
+        >>> object_to_string([1, [2, {'A': [], 'B': Name('N')}], {}])
+        '[1 [2 <</A [] /B /N>>] <<>>]'
+
+        Subclasses of arrays and dictionaries are nested the same way:
+
+        >>> class Sub(list): pass
+        >>> deep = Sub()
+        >>> for _ in range(depth):
+        ...     deep = Sub([deep])
+        >>> object_to_string(deep) == "[" * (depth + 1) + "]" * (depth + 1)
+        True
+    """
+    opening, closing = _container_bounds(obj)
+    res = [opening]
+    stack = [(_container_items(obj), closing)]
+    while stack:
+        items, closing = stack[-1]
+        for prefix, value in items:
+            res.append(prefix)
+            handler = _item_to_string_dispatch.get(type(value)) or _get_item_to_string_handler(value)
+            if handler is _nested_to_string:
+                # continue with the nested container, the current one is resumed later
+                opening, nested_closing = _container_bounds(value)
+                res.append(opening)
+                stack.append((_container_items(value), nested_closing))
+                break
+            res.append(handler(value))
         else:
-            # encode binary content with ASCII85Decode to make in human-readable
-            new_filters = ["ASCII85Decode"] + new_filters
-            content = b85encode(obj.data) + b'~>'
+            stack.pop()
+            res.append(closing)
+    return "".join(res)
+
+
+def _operator_to_string(obj):
+    return "\n" + " ".join(map(object_to_string, obj.args)) + " " + obj.name
 
-        str_filters = "".join([" /{} ".format(f) for f in new_filters])
-        entries += " /Filter [{}]".format(str_filters)
-        val = "\nBI\n{entries}\nID\n{content}\nEI".format(entries=entries, content=content.decode('ascii'))
-    elif isinstance(obj, bytes):
-        logging.warning("Binary data. Using default encoding. Possibly arg of unsupported operator: {}"
-                        .format(repr(bytes)))
-        val = obj.decode(DEFAULT_ENCODING, 'replace')
+
+def _inline_image_to_string(obj):
+    """
+    >>> img = InlineImage({'W': 1, 'H': 1, 'F': 'Fl'}, b'abc')
+    >>> object_to_string(img)
+    '\\nBI\\n/W 1 /H 1 /Filter [ /ASCII85Decode  /Fl ]\\nID\\nVPaz~>\\nEI'
+    >>> img.data = b'xyz'
+    >>> object_to_string(img)
+    '\\nBI\\n/W 1 /H 1 /Filter [ /ASCII85Decode  /Fl ]\\nID\\nczJp~>\\nEI'
+    """
+    # Convert bytes to string representation
+    # We encode the image with ASCII85 to make it a unicode string
+    entries = " ".join(["/{} {}".format(k, object_to_string(v))
+                        for k, v in obj.dictionary.items()
+                        if k not in ('F', 'Filter')])
+    new_filters = obj.Filter if isinstance(obj.Filter, list) else [obj.Filter]
+    last_filter = new_filters[0]
+    if last_filter in ascii_filters:
+        # data stream contains ASCII characters
+        content = obj.data
     else:
-        raise ValueError("Unexpected object: {}. Possibly a bug.".format(obj))
-    return val
+        # encode binary content with ASCII85Decode to make in human-readable
+        new_filters = ["ASCII85Decode"] + new_filters
+        cached = _inline_image_b85.get(obj)
+        if cached is not None and cached[0] is obj.data:
+            content = cached[1]
+        else:
+            content = b85encode(obj.data) + b'~>'
+            _inline_image_b85[obj] = (obj.data, content)
+
+    str_filters = "".join([" /{} ".format(f) for f in new_filters])
+    entries += " /Filter [{}]".format(str_filters)
+    return "\nBI\n{entries}\nID\n{content}\nEI".format(entries=entries, content=content.decode('ascii'))
+
+
+def _bytes_to_string(obj):
+    logging.warning("Binary data. Using default encoding. Possibly arg of unsupported operator: {}"
+                    .format(repr(bytes)))
+    return obj.decode(DEFAULT_ENCODING, 'replace')
+
+
+# Order matters: Boolean is int subclass, Name is str subclass
+_to_string_handlers = ((Boolean, _boolean_to_string),
+                       (Name, _name_to_string),
+                       (str, _str_to_string),
+                       ((int, Integer, Decimal), _number_to_string),
+                       (Array, _array_to_string),
+                       (Dictionary, _dictionary_to_string),
+                       (Operator, _operator_to_string),
+                       (InlineImage, _inline_image_to_string),
+                       (bytes, _bytes_to_string))
+
+# exact type -> handler, other subclasses are resolved and added on first use
+_to_string_dispatch = {type(None): _null_to_string,
+                       Boolean: _boolean_to_string,
+                       Name: _name_to_string,
+                       HexString: _str_to_string,
+                       str: _str_to_string,
+                       Integer: _number_to_string,
+                       Decimal: _number_to_string,
+                       Array: _array_to_string,
+                       Dictionary: _dictionary_to_string,
+                       Operator: _operator_to_string,
+                       InlineImage: _inline_image_to_string,
+                       String: _bytes_to_string,
+                       bytes: _bytes_to_string}
+
+
+def _get_to_string_handler(obj):
+    for types, handler in _to_string_handlers:
+        if isinstance(obj, types):
+            _to_string_dispatch[type(obj)] = handler
+            return handler
+    raise ValueError("Unexpected object: {}. Possibly a bug.".format(obj))
+
+
+def object_to_string(obj):
+    handler = _to_string_dispatch.get(type(obj)) or _get_to_string_handler(obj)
+    return handler(obj)
+
+
+# Same as _to_string_dispatch, but containers nested into arrays and dictionaries are serialized without recursion.
+# Other subclasses are resolved and added on first use.
+_item_to_string_dispatch = dict(_to_string_dispatch)
+_item_to_string_dispatch.update({Array: _nested_to_string,
+                                 Dictionary: _nested_to_string})
+
+
+def _get_item_to_string_handler(obj):
+    handler = _get_to_string_handler(obj)
+    if handler is _array_to_string or handler is _dictionary_to_string:
+        handler = _nested_to_string
+    _item_to_string_dispatch[type(obj)] = handler
+    return handler
+
+
+def _item_to_string(obj):
+    """ object_to_string for array and dictionary items """
+    handler = _item_to_string_dispatch.get(type(obj)) or _get_item_to_string_handler(obj)
+    return handler(obj)
+
+
+_text_string_types = (HexString, String)
+
+
+@lru_cache(maxsize=4096)
+def _escaped_paren(s):
+    """ PDF string literal for a decoded string. Text operators repeat the same strings a lot. """
+    return "(" + pdf_escape_string(s) + ")"
 
 
 class TextOperatorsMixin(object):
@@ -75,6 +243,7 @@ class TextOperatorsMixin(object):
         self.bracket_commands_stack = [] # one day we may start support BX/EX, MDC/BMC/EMC.
                                          # BI/EI comes as a part of ContentParser due to inline image object nature
         self._decoders = dict()
+        self._str_cache = dict()  # (font name, raw string) -> decoded string
 
     @property
     def mode(self):
@@ -85,24 +254,61 @@ class TextOperatorsMixin(object):
     @property
     def decoder(self):
         name = self.gss.state.font_name
-        if name not in self._decoders:
+        obj = self._decoders.get(name)
+        if obj is None:
             if name in self.resources.Font:
                 obj = Decoder(self.resources.Font[name])
             else:
                 obj = default_decoder
             self._decoders[name] = obj
-        return self._decoders[name]
+        return obj
 
     def decode_string(self, s):
-        if isinstance(s, HexString):
-            s = self.decoder.decode_hexstring(s)
-        else:
-            s = self.decoder.decode_string(s)
-        return s
+        """
+        Decoded strings are cached per font, so the same raw string decodes according to the current font:
+
+        >>> from unittest.mock import Mock, patch
+        >>> viewer = SimplePDFViewer.__new__(SimplePDFViewer)
+        >>> viewer.canvas = SimpleCanvas()
+        >>> viewer.gss = Mock()
+        >>> viewer._str_cache = dict()
+        >>> viewer._decoders = {'F1': Mock(decode_string=lambda s: s.decode().upper()),
+        ...                     'F2': Mock(decode_string=lambda s: s.decode().lower())}
+        >>> viewer.gss.state.font_name = 'F1'
+        >>> viewer.decode_string(String(b'Abc'))
+        'ABC'
+        >>> viewer.gss.state.font_name = 'F2'
+        >>> viewer.decode_string(String(b'Abc'))
+        'abc'
+        >>> viewer.gss.state.font_name = 'F1'
+        >>> viewer.decode_string(String(b'Abc'))
+        'ABC'
+        >>> sorted(viewer._str_cache.values())
+        ['ABC', 'abc']
+
+        The cache is reset on navigation to another page:
+
+        >>> with patch.object(PDFViewer, 'after_navigate') as _:
+        ...     viewer.after_navigate(2)
+        >>> viewer._str_cache
+        {}
+        """
+        key = (self.gss.state.font_name, s)
+        res = self._str_cache.get(key)
+        if res is None:
+            if isinstance(s, HexString):
+                res = self.decoder.decode_hexstring(s)
+            else:
+                res = self.decoder.decode_string(s)
+            if len(self._str_cache) >= STR_CACHE_SIZE:
+                # evict the oldest entry
+                del self._str_cache[next(iter(self._str_cache))]
+            self._str_cache[key] = res
+        return res
 
     def after_handler(self, obj):
         """ Put object on canvas """
-        self.canvas.text_content += object_to_string(obj)
+        self.canvas.add_text_content(object_to_string(obj))
 
     def on_inline_image(self, obj):
         self.canvas.inline_images.append(obj)
@@ -128,18 +334,20 @@ class TextOperatorsMixin(object):
         """
         s = self.decode_string(op.args[0])
         self.canvas.strings.append(s)
-        op.args = ["({})".format(pdf_escape_string(s))]
+        op.args = [_escaped_paren(s)]
 
     on_apostrophe = on_Tj
 
     def on_TJ(self, op):
         """ Show one or more text strings  """
         arr = op.args[0]
-        for i in range(len(arr)):
-            if isinstance(arr[i], (HexString, String)):
-                s = self.decode_string(arr[i])
-                self.canvas.strings.append(s)
-                arr[i] = "({})".format(pdf_escape_string(s))
+        decode_string = self.decode_string
+        add_string = self.canvas.strings.append
+        for i, elm in enumerate(arr):
+            if isinstance(elm, _text_string_types):
+                s = decode_string(elm)
+                add_string(s)
+                arr[i] = _escaped_paren(s)
 
     on_quotation = on_TJ
 
@@ -190,6 +398,7 @@ class SimplePDFViewer(TextOperatorsMixin, PDFViewer):
 
     def after_navigate(self, n):
         self._decoders = dict()
+        self._str_cache = dict()
         self.bracket_commands_stack = []
         super(SimplePDFViewer, self).after_navigate(n)
 
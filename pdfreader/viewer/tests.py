@@ -0,0 +1,20 @@
+import unittest
+import doctest
+
+from . import simple
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTests(doctest.DocTestSuite(simple))
+    return suite
+
+
+def load_tests(loader, tests, ignore):
+    tests.addTests(suite())
+    return tests
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
\ No newline at end of file